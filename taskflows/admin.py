@@ -1,24 +1,22 @@
+import os
 import re
 import subprocess
+import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from fnmatch import fnmatchcase
-from functools import lru_cache
-from itertools import cycle
+from fnmatch import translate
+from functools import cache
+from itertools import chain
 from pathlib import Path
 from typing import List, Optional
+from zlib import crc32
 from zoneinfo import ZoneInfo
 
 import click
 import sqlalchemy as sa
 from click.core import Group
 from dynamic_imports import class_inst
-from rich import box
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.text import Text
-from textdistance import lcsseq
 
 from taskflows import _SYSTEMD_FILE_PREFIX
 
@@ -32,8 +30,10 @@ from .service.service import (
     _restart_service,
     _start_service,
     _stop_service,
+    clear_unit_file_cache,
     extract_service_name,
     get_schedule_info,
+    get_schedules_info,
     get_unit_file_states,
     get_unit_files,
     get_units,
@@ -41,7 +41,20 @@ from .service.service import (
     systemd_manager,
 )
 
-cli = Group("taskflows", chain=True)
+# cached unit file lookups are cleared when a (possibly chained) CLI invocation starts.
+cli = Group("taskflows", chain=True, callback=clear_unit_file_cache)
+
+# matches the prefix of both service and stop-service unit file stems.
+_UNIT_PREFIX_RE = re.compile(f"^(?:stop-)?{re.escape(_SYSTEMD_FILE_PREFIX)}")
+
+
+@cache
+def get_console():
+    # rich is imported on first use so that commands which don't render tables start faster.
+    from rich.console import Console
+
+    # cell values are plain text, so skip rich's markup parsing and highlighting.
+    return Console(markup=False, highlight=False)
 
 
 @cli.command
@@ -67,30 +80,22 @@ def history(limit: int, match: str = None):
         match (str, optional): Only show history for task names matching this pattern.
                               Uses SQL LIKE pattern matching (% wildcards). Defaults to None.
     """
-    
+    from rich import box
+    from rich.table import Table
+
     # Import the task runs table from the database
     table = get_tasks_db().task_runs_table
     
-    # Initialize a console to print the output
-    console = Console()
-    
     # Define the color scheme for table columns
     column_color = table_column_colors()
     
-    # Create a query to select distinct task names from the task runs table
-    task_names_query = sa.select(table.c.task_name).distinct()
-    
+    # Create a query to select all columns from the table
+    # Order the results by the most recent start time and task name
+    query = sa.select(table).order_by(table.c.started.desc(), table.c.task_name)
+
     # If a match pattern is provided, filter the task names using the pattern
     if match:
-        task_names_query = task_names_query.where(table.c.task_name.like(f"%{match}%"))
-    
-    # Create a query to select all columns from the table, filtered by task names
-    # Order the results by the most recent start time and task name
-    query = (
-        sa.select(table)
-        .where(table.c.task_name.in_(task_names_query))
-        .order_by(table.c.started.desc(), table.c.task_name)
-    )
+        query = query.where(table.c.task_name.like(f"%{match}%"))
     
     # Limit the number of results if a limit is provided
     if limit:
@@ -98,28 +103,34 @@ def history(limit: int, match: str = None):
     
     # Format column names to be more readable in the table (replace underscores and title-case)
     columns = [c.name.replace("_", " ").title() for c in table.columns]
-    
-    # Execute the query and fetch all results in a transaction
-    with engine.begin() as conn:
-        rows = [dict(zip(columns, row)) for row in conn.execute(query).fetchall()]
-    
+    # Index of each displayed column in the result rows
+    col_idxs = list(range(len(columns)))
+    retries_idx = table.c.keys().index("retries")
+
+    # Execute the query and fetch all results. The query is read-only, so nothing is committed: the transaction
+    # connect() begins implicitly is rolled back when the connection is closed.
+    with engine.connect() as conn:
+        rows = conn.execute(query).fetchall()
+
     # Create a table with a simple box style and a title
     table = Table(title="Task History", box=box.SIMPLE)
-    
+
     # Remove the 'Retries' column if all its values are zero
-    if all(row["Retries"] == 0 for row in rows):
-        columns.remove("Retries")
-    
+    show_retries = any(row[retries_idx] for row in rows)
+    if not show_retries:
+        columns.pop(retries_idx)
+        col_idxs.pop(retries_idx)
+
     # Add columns to the table with specified styles
     for c in columns:
         table.add_column(c, style=column_color(c), justify="center")
-    
+
     # Add rows of data to the table
     for row in rows:
-        table.add_row(*[str(row[c]) for c in columns])
+        table.add_row(*[str(row[i]) for i in col_idxs])
     
     # Print the table to the console, centered
-    console.print(table, justify="center")
+    get_console().print(table, justify="center")
 
 
 @cli.command(name="list")
@@ -193,38 +204,56 @@ def status(match: str, running: bool):
     The output is sorted by service name using intelligent grouping.
     Times are displayed in the configured timezone from config.display_timezone.
     """
+    from rich import box
+    from rich.table import Table
+    from rich.text import Text
+
     # Get all service files matching the provided pattern
     srv_states = get_unit_file_states(unit_type="service", match=match)
     # If there are no matching files, print a message and exit
     if not srv_states:
         click.echo(click.style("No services found.", fg="yellow"))
         return
-    manager = systemd_manager()
     units_meta = defaultdict(dict)
     for file_path, enabled_status in srv_states.items():
-        file_path = Path(file_path)
-        unit_meta = units_meta[file_path.stem]
+        unit_meta = units_meta[Path(file_path).stem]
         unit_meta["Service\nEnabled"] = enabled_status
-        # TODO not load?
-        manager.LoadUnit(file_path.name)
     timer_states = get_unit_file_states(unit_type="timer", match=match)
     for file_path, enabled_status in timer_states.items():
         unit_file = Path(file_path)
         unit_meta = units_meta[unit_file.stem]
         unit_meta["Timer\nEnabled"] = enabled_status
-    #from pprint import pprint
-    #pprint(units_meta)
-    #return
+    # fetch all schedules with one shared manager proxy.
+    # this also loads the taskflow-* service units, so get_units will list them even when inactive.
+    schedules = get_schedules_info(list(units_meta.keys()))
+    # schedule lookups add the prefix to other stems (e.g. stop-taskflow-*), so load those units here.
+    load_unit = systemd_manager().LoadUnit
+    for file_path in srv_states:
+        if not (unit_name := os.path.basename(file_path)).startswith(_SYSTEMD_FILE_PREFIX):
+            load_unit(unit_name)
     units = get_units(
         unit_type="service",
         match=match,
         states=None,
     )
     for unit in units:
-        units_meta[Path(unit["unit_name"]).stem].update(unit)
+        units_meta[unit["unit_name"].rsplit(".", 1)[0]].update(unit)
+    display_tz = ZoneInfo(config.display_timezone)
+    now = datetime.now()
+    # keys are already unit file stems, so only the prefix needs to be removed.
     for unit_name, data in units_meta.items():
-        data.update(get_schedule_info(unit_name))
-        data["Service"] = extract_service_name(unit_name)
+        data.update(schedules.get(unit_name) or get_schedule_info(unit_name))
+        data["Service"] = unit_name.removeprefix(_SYSTEMD_FILE_PREFIX)
+        if data.get("active_state") == "active" and (
+            last_start := data.get("Last Start")
+        ):
+            data["Uptime"] = str(now - last_start).split(".")[0]
+        # format times once here so the render loop only deals with strings.
+        for dt_col in ("Last Start", "Last Finish", "Next Start"):
+            if (dt := data.get(dt_col)) is not None:
+                data[dt_col] = dt.astimezone(display_tz).strftime(
+                    "%Y-%m-%d %I:%M:%S %p"
+                )
     units_meta = {
         k: v for k, v in units_meta.items() if v.get("load_state") != "not-found"
     }
@@ -328,47 +357,41 @@ def status(match: str, running: bool):
             continue
         row["Timers"] = (
             "\n".join(
-                [f"{t['base']}({t['spec']})" for t in row.get("Timers Calendar", [])]
-                + [
-                    f"{t['base']}({t['offset']})"
-                    for t in row.get("Timers Monotonic", [])
-                ]
+                chain(
+                    (f"{t['base']}({t['spec']})" for t in row.get("Timers Calendar", ())),
+                    (
+                        f"{t['base']}({t['offset']})"
+                        for t in row.get("Timers Monotonic", ())
+                    ),
+                )
             )
             or "-"
         )
-        if row.get("active_state") == "active" and (
-            last_start := row.get("Last Start")
-        ):
-            row["Uptime"] = str(datetime.now() - last_start).split(".")[0]
-        for dt_col in (
-            "Last Start",
-            "Last Finish",
-            "Next Start",
-        ):
-            if isinstance(row.get(dt_col), datetime):
-                row[dt_col] = (
-                    row[dt_col]
-                    .astimezone(ZoneInfo(config.display_timezone))
-                    .strftime("%Y-%m-%d %I:%M:%S %p")
-                )
         row_text = []
         for col in columns:
             if (val := row.get(col)) is None:
                 val = "-"
-            row_text.append(
-                Text(
-                    str(val),
-                    overflow="fold",
-                    style=column_value_colors.get(col, {}).get(val),
-                )
-            )
+            val = str(val)
+            # only wrap cells that need a value-dependent color.
+            if (style := column_value_colors.get(col, {}).get(val)) is not None:
+                val = Text(val, overflow="fold", style=style)
+            row_text.append(val)
         table.add_row(*row_text)
-    Console().print(table, justify="center")
+    get_console().print(table, justify="center")
 
 
 @cli.command
 @click.argument("service_name")
-def logs(service_name: str):
+@click.option(
+    "-n",
+    "--lines",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Number of past journal lines to show before following new output. "
+    "Larger values make journald scan its journal files before streaming, which can be slow on large journals.",
+)
+def logs(service_name: str, lines: int):
     """Show logs for a service.
     
     This command displays the systemd journal logs for the specified service
@@ -378,6 +401,8 @@ def logs(service_name: str):
     Args:
         service_name (str): The name of the service to show logs for.
                            The systemd prefix will be automatically added.
+        lines (int): Number of past log lines to show before following. Defaults to 0,
+                     which skips journald's backfill scan and only streams new entries.
     """
     # TODO check if arg has extension.
     click.echo(
@@ -386,9 +411,19 @@ def logs(service_name: str):
             fg="yellow",
         )
     )
-    subprocess.run(
-        f"journalctl --user -f -u {_SYSTEMD_FILE_PREFIX}{service_name}".split()
-    )
+    cmd = [
+        "journalctl",
+        "--user",
+        "-f",
+        f"--lines={lines}",
+        "-u",
+        f"{_SYSTEMD_FILE_PREFIX}{service_name}",
+    ]
+    if sys.stdout is sys.__stdout__:
+        # nothing runs after following the logs, so replace this process instead of forking.
+        os.execvp(cmd[0], cmd)
+    # output is being captured (e.g. by the Slack bot), so keep this process alive.
+    subprocess.run(cmd)
 
 def create(
     search_in: str, include: Optional[str] = None, exclude: Optional[str] = None
@@ -405,19 +440,22 @@ def create(
     services = class_inst(class_type=Service, search_in=search_in)
 
     # if include is given, filter the services to only include those that match the pattern.
+    # patterns are translated to regexes once instead of per service.
     if include:
+        include_re = re.compile(translate(include))
         services = [
             s  # type: ignore
             for s in services
-            if fnmatchcase(name=s.name, pat=include)  # type: ignore
+            if include_re.match(s.name)  # type: ignore
         ]
 
     # if exclude is given, filter the services to exclude those that match the pattern.
     if exclude:
+        exclude_re = re.compile(translate(exclude))
         services = [
             s  # type: ignore
             for s in services
-            if not fnmatchcase(name=s.name, pat=exclude)  # type: ignore
+            if not exclude_re.match(s.name)  # type: ignore
         ]
 
     # print the number of services found after filtering.
@@ -658,9 +696,11 @@ def remove(match: str):
         match (str): Name or name pattern of service(s) to remove.
                     Both service and timer files matching this pattern will be removed.
     """
+    # list matching unit files once and split them by type.
+    files = get_unit_files(match=match)
     _remove_service(
-        service_files=get_unit_files(unit_type="service", match=match),
-        timer_files=get_unit_files(unit_type="timer", match=match),
+        service_files=[f for f in files if f.endswith(".service")],
+        timer_files=[f for f in files if f.endswith(".timer")],
     )
     click.echo(click.style("Done!", fg="green"))
 
@@ -678,6 +718,9 @@ def show(match: str):
         match (str): Name or glob pattern of services to show.
                     Both service (.service) and timer (.timer) files are displayed.
     """
+    from rich.panel import Panel
+    from rich.text import Text
+
     # Get a dict of the form {service_name: [file1, file2, ...]}
     # where each file is either a service file or a timer file
     # that belongs to the given service.
@@ -692,28 +735,28 @@ def show(match: str):
             # extension. We remove the prefix that we added
             # when we created the file so that we can
             # identify the service name.
-            srv_name = re.sub(
-                f"^(?:stop-)?{_SYSTEMD_FILE_PREFIX}", "", file.stem
-            )
+            srv_name = _UNIT_PREFIX_RE.sub("", file.stem)
             srv_files[srv_name].append(file)
-    # We use the rich library to print the file contents
-    # with a nice title and border.
-    console = Console()
     # We sort the service names so that they are printed in
     # a consistent order.
-    for srv_name in sort_service_names(srv_files.keys()):
+    srv_names = sort_service_names(srv_files.keys())
+    # Read all files up front, overlapping the reads in a small thread pool.
+    all_files = [file for srv_name in srv_names for file in srv_files[srv_name]]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        file_texts = dict(zip(all_files, executor.map(Path.read_text, all_files)))
+    for srv_name in srv_names:
         files = srv_files[srv_name]
         # Print a title with the service name and a line
         # underneath it.
-        console.rule(f"[bold green]{srv_name}")
+        get_console().rule(Text(srv_name, style="bold green"))
         # For each file, print its contents in a panel.
         for file in files:
-            console.print(
+            get_console().print(
                 # The Panel class is a rich widget that
                 # prints a box around the given text.
                 Panel.fit(
                     # The contents of the file.
-                    file.read_text(),
+                    file_texts[file],
                     # The title of the panel is the name of
                     # the file.
                     title=str(file),
@@ -725,91 +768,75 @@ def show(match: str):
             )
 
 
+_COLUMN_COLORS = (
+    "cyan",
+    "light_steel_blue",
+    "orchid",
+    "magenta",
+    "dodger_blue1",
+)
+
+
+def _column_color(col_name: str) -> str:
+    # crc32 is stable across processes, unlike the salted builtin str hash.
+    return _COLUMN_COLORS[crc32(col_name.encode()) % len(_COLUMN_COLORS)]
+
+
 def table_column_colors():
     """
     Returns a function that assigns colors to table columns.
 
-    This function uses a cycle of predefined colors and a least-recently-used
-    cache to generate a consistent color for each column name. The colors are
-    cycled through as column names are provided.
+    Each column name is hashed into a fixed palette, so a column always gets
+    the same color, in every table and every CLI invocation.
 
     Returns:
         A function that takes a column name as input and returns a color string.
     """
-
-    colors_gen = cycle(
-        [
-            "cyan",
-            "light_steel_blue",
-            "orchid",
-            "magenta",
-            "dodger_blue1",
-        ]
-    )
-
-    @lru_cache
-    def column_color(col_name: str) -> str:
-        return next(colors_gen)
-
-    return column_color
+    return _column_color
 
 
 def sort_service_names(services: List[str]) -> List[str]:
     """
     Sort service names to display in a list.
 
-    This function takes a list of service names and sorts them intelligently,
-    grouping stop services with their corresponding main services. The sorting
-    uses text similarity to order related services together.
+    This function takes a list of service names and sorts them so that related
+    services are grouped together and stop services follow their corresponding
+    main services.
 
     Args:
         services (List[str]): A list of service names to sort.
 
     Returns:
         List[str]: A sorted list where stop services appear immediately after
-                  their corresponding main services, ordered by similarity.
+                  their corresponding main services.
 
     The sorting algorithm:
     1. Separates services into stop services (prefixed with "stop-{prefix}") and regular services
     2. Normalizes service names by replacing hyphens and underscores with spaces
-    3. Orders services by text similarity using longest common subsequence
+    3. Sorts services by normalized name, so services sharing a name prefix are adjacent
     4. Places stop services immediately after their corresponding main services
     """
     # Define the prefix used for stopped services
     stop_prefix = f"stop-{_SYSTEMD_FILE_PREFIX}"
     
     # Separate services into two categories: those that start with the stop prefix and those that do not
-    stop_services, non_stop_services = [], []
+    # (stop services are only used for membership checks, so keep them in a set)
+    stop_services, non_stop_services = set(), []
     for srv in services:
         if srv.startswith(stop_prefix):
-            stop_services.append(srv)
+            stop_services.add(srv)
         else:
             non_stop_services.append(srv)
 
-    # Normalize non-stop service names by replacing hyphens and underscores with spaces for similarity comparison
-    non_stop_services = [
-        (s, s.replace("-", " ").replace("_", " ")) for s in non_stop_services
-    ]
-    
-    # Start the ordering process with the first non-stop service
-    srv, filt_srv = non_stop_services.pop(0)
-    ordered = [srv]
-    
-    # Continue ordering the remaining non-stop services
-    while non_stop_services:
-        # Find the service with the greatest similarity to the current service
-        best = max(non_stop_services, key=lambda o: lcsseq.similarity(filt_srv, o[1]))
-        
-        # Update the current service and filtered service to the best match found
-        srv, filt_srv = best
-        
-        # Remove the matched service from the list and append it to the ordered list
-        non_stop_services.remove(best)
+    # Sort non-stop services by name with hyphens and underscores normalized to spaces
+    non_stop_services.sort(key=lambda s: s.replace("-", " ").replace("_", " "))
+
+    ordered = []
+    for srv in non_stop_services:
         ordered.append(srv)
-        
         # Check if the corresponding stop service exists and append it if found
         if (stp_srv := f"{stop_prefix}{srv}") in stop_services:
             ordered.append(stp_srv)
-    
+
     # Return the fully ordered list of services
     return ordered
@@ -2,28 +2,46 @@ import asyncio
 import inspect
 import signal
 import sys
+import threading
 import traceback
-from functools import cache
-from pprint import pformat
-from typing import Any, Callable, Dict
+import weakref
+from typing import Any, Callable, Dict, Optional
 
 from taskflows import logger
 
 
-@cache
-def get_shutdown_handler():
+_SIGNAL_NAMES = {s.value: s.name for s in signal.Signals}
+
+# weak keys, so handlers are dropped with their loops (e.g. loops created by tests or threads).
+_shutdown_handlers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ShutdownHandler]" = (
+    weakref.WeakKeyDictionary()
+)
+_shutdown_handlers_lock = threading.Lock()
+
+
+def get_shutdown_handler(loop: Optional[asyncio.AbstractEventLoop] = None):
     """
-    Return an instance of ShutdownHandler.
+    Return the ShutdownHandler for an event loop.
 
-    This function is memoized.
+    One instance is created per event loop. Creation is guarded by a lock, so
+    concurrent first calls can not install signal handlers twice.
 
+    :param loop: The event loop to get the handler for. Defaults to the current event loop.
     :return: An instance of ShutdownHandler.
     """
-    return ShutdownHandler()
+    loop = loop or asyncio.get_event_loop_policy().get_event_loop()
+    with _shutdown_handlers_lock:
+        if (sdh := _shutdown_handlers.get(loop)) is None:
+            sdh = _shutdown_handlers[loop] = ShutdownHandler(loop=loop)
+    return sdh
 
 
 class ShutdownHandler:
-    def __init__(self, shutdown_on_exception: bool = False):
+    def __init__(
+        self,
+        shutdown_on_exception: bool = False,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
         """
         Initialize the ShutdownHandler.
 
@@ -33,17 +51,24 @@ class ShutdownHandler:
         Args:
             shutdown_on_exception (bool): If True, initiate shutdown on
                 uncaught exceptions. Defaults to False.
+            loop (Optional[asyncio.AbstractEventLoop]): The event loop to manage.
+                Defaults to the current event loop.
         """
         self.shutdown_on_exception = shutdown_on_exception
-        self.loop = asyncio.get_event_loop_policy().get_event_loop()
+        # only a weak reference, so a handler in `_shutdown_handlers` doesn't keep its loop alive.
+        self._loop = weakref.ref(loop or asyncio.get_event_loop_policy().get_event_loop())
         self.callbacks = []
         self._shutdown_task = None
+        # tasks awaiting shutdown(). they finish with the shutdown, so they are not cancelled or waited on.
+        self._shutdown_waiters = set()
         self.loop.set_exception_handler(self._loop_exception_handle)
         for s in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
-            self.loop.add_signal_handler(
-                s,
-                lambda s=s: self.loop.create_task(self._on_signal_interrupt(s)),
-            )
+            self.loop.add_signal_handler(s, self._on_signal, s)
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """The managed event loop (None if it has been garbage collected)."""
+        return self._loop()
 
     def add_callback(self, cb: Callable[[], None]):
         """
@@ -75,6 +100,8 @@ class ShutdownHandler:
         """
         if self._shutdown_task is None:
             self._create_shutdown_task(exit_code)
+        if (task := asyncio.current_task()) is not None:
+            self._shutdown_waiters.add(task)
         return await self._shutdown_task
 
     def _loop_exception_handle(self, loop: Any, context: Dict[str, Any]):
@@ -90,7 +117,8 @@ class ShutdownHandler:
         :param context: A dictionary containing information about the
             exception.
         """
-        logger.error("Uncaught coroutine exception: %s", pformat(context))
+        # %r defers the repr of the context until the record is actually emitted.
+        logger.error("Uncaught coroutine exception: %r", context)
         # Extract the exception object from the context
         exception = context.get("exception")
         if exception:
@@ -105,20 +133,23 @@ class ShutdownHandler:
         if self.shutdown_on_exception and (self._shutdown_task is None):
             self._create_shutdown_task(1)
 
-    async def _on_signal_interrupt(self, signum: int):
+    def _on_signal(self, signum: int):
         """
         Handle a signal interrupt.
 
-        This function is called when a signal interrupt is received. It logs a
-        message indicating the signal that was received and shuts down the event
-        loop.
+        This function is called in the event loop thread when a signal is
+        received. It logs a message indicating the signal that was received and
+        schedules shutdown of the event loop. Signals received after shutdown
+        has started are ignored.
 
         Args:
             signum (int): The signal number that was received.
         """
-        signame = signal.Signals(signum).name if signum is not None else "Unknown"
+        if self._shutdown_task is not None:
+            return
+        signame = _SIGNAL_NAMES.get(signum, "Unknown")
         logger.warning("Caught signal %i (%s). Shutting down.", signum, signame)
-        await self.shutdown(0)
+        self._create_shutdown_task(0)
 
     def _create_shutdown_task(self, exit_code: int):
         """
@@ -142,8 +173,8 @@ class ShutdownHandler:
 
         This method executes the shutdown process in the following steps:
 
-        1. Execute all registered shutdown callbacks.
-        2. Cancel all outstanding tasks in the event loop.
+        1. Execute all registered shutdown callbacks concurrently.
+        2. Cancel all outstanding tasks in the event loop and wait for them to finish.
         3. Stop the event loop.
         4. Exit the program with the specified exit code.
 
@@ -151,27 +182,51 @@ class ShutdownHandler:
             exit_code (int): The exit code to use when terminating the program.
         """
         logger.info("Shutting down. Exit code: %s", exit_code)
-        # Execute all registered shutdown callbacks
-        for cb in self.callbacks:
-            logger.info("Calling shutdown callback: %s", cb)
-            try:
-                # Wait up to 5 seconds for each callback to complete
-                await asyncio.wait_for(cb(), timeout=5)
-            except Exception as err:
-                # Log any exceptions that occur in the callbacks
-                logger.exception(
-                    "%s error in shutdown callback %s: %s",
-                    type(err),
-                    cb,
-                    err,
-                )
-        # Cancel all outstanding tasks in the event loop
-        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        # Execute all registered shutdown callbacks concurrently, waiting up to 5 seconds for them to complete
+        if self.callbacks:
+            cb_tasks = {}
+            for cb in self.callbacks:
+                logger.info("Calling shutdown callback: %s", cb)
+                cb_tasks[self.loop.create_task(cb())] = cb
+            # one timeout for the whole batch instead of a wait_for timer per callback.
+            done, pending = await asyncio.wait(cb_tasks, timeout=5)
+            for task in pending:
+                task.cancel()
+                logger.error("Shutdown callback %s timed out", cb_tasks[task])
+            for task in done:
+                # exception() raises CancelledError for a cancelled task, which would abort the shutdown.
+                if task.cancelled():
+                    logger.error("Shutdown callback %s was cancelled", cb_tasks[task])
+                elif (err := task.exception()) is not None:
+                    # Log any exceptions that occur in the callbacks
+                    logger.error(
+                        "%s error in shutdown callback %s: %s",
+                        type(err),
+                        cb_tasks[task],
+                        err,
+                        exc_info=err,
+                    )
+        # Cancel all outstanding tasks in the event loop. Tasks awaiting shutdown() are left alone: cancelling
+        # them would also cancel this task, and waiting on them would wait on this task.
+        tasks = [
+            t
+            for t in asyncio.all_tasks()
+            if t is not asyncio.current_task() and t not in self._shutdown_waiters
+        ]
         logger.info("Cancelling %i outstanding tasks", len(tasks))
         for task in tasks:
             # Cancel the task to prevent it from running after we've stopped
             # the event loop
             task.cancel()
+        if tasks:
+            # Give the cancellations a chance to propagate. The wait is shielded so the
+            # cancelled tasks still get their time to clean up if this task is cancelled.
+            wait_tasks = asyncio.ensure_future(asyncio.wait(tasks, timeout=5))
+            while not wait_tasks.done():
+                try:
+                    await asyncio.shield(wait_tasks)
+                except asyncio.CancelledError:
+                    pass
         # Stop the event loop to prevent any new tasks from being scheduled
         self.loop.stop()
         # Exit the program with the specified exit code
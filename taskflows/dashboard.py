@@ -1,35 +1,38 @@
 #!/usr/bin/env python
-import json
 import os
-from dataclasses import dataclass
-from typing import List, Literal, Optional
+from dataclasses import dataclass, field
+from functools import cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Optional
 
 import requests
-from grafanalib._gen import DashboardEncoder
-from grafanalib.core import Annotation, Annotations, Dashboard, Graph, Target, Time
+from requests.adapters import HTTPAdapter
 
 from taskflows.service import Service
 
+# grafanalib is only needed when a dashboard is built, so it is imported there.
+if TYPE_CHECKING:
+    from grafanalib.core import Dashboard, Graph
 
-@dataclass
+
+@dataclass(slots=True)
 class ServiceLogsPanel:
     service: Service
     height: Literal['sm', 'md', 'lg', 'xl']
-    width_fr: Optional[float] = None  # Fraction of the width (e.g., 0.5 for half-width, 1.0 for full-width)    
+    # Fraction of the width (e.g., 0.5 for half-width, 1.0 for full-width)
+    # keyword-only so subclasses can add required fields after it.
+    width_fr: Optional[float] = field(default=None, kw_only=True)
+
+    # panel heights (grid units) for each height name.
+    _HEIGHTS = {'sm': 5, 'md': 10, 'lg': 15, 'xl': 20}
 
     @property
     def height_no(self) -> int:
-        if self.height == 'sm':
-            return 5
-        if self.height == 'md':
-            return 10
-        if self.height == 'lg':
-            return 15
-        if self.height == 'xl':
-            return 20
-        raise ValueError(f"Invalid height: {self.height}")
-
-@dataclass
+        try:
+            return self._HEIGHTS[self.height]
+        except KeyError:
+            raise ValueError(f"Invalid height: {self.height}") from None
+
+@dataclass(slots=True)
 class LogsTextSearch(ServiceLogsPanel):
     text: str
     title: Optional[str] = None 
@@ -40,7 +43,7 @@ class LogsTextSearch(ServiceLogsPanel):
 
         
 
-@dataclass
+@dataclass(slots=True)
 class LogsCountPlot(ServiceLogsPanel):
     text: str
     period: str = "5m"  # e.g., "1m", "5m", etc.
@@ -51,7 +54,121 @@ class LogsCountPlot(ServiceLogsPanel):
             self.title = f"{self.service.name}: {self.text} Counts"
 
 
-def create_dashboard(title: str, panels_grid: List[ServiceLogsPanel | List[ServiceLogsPanel]]) -> Dashboard:
+# TODO where to get uid?
+_LOKI_DATASOURCE = {"type": "loki", "uid": "P982945308D3682D1"}
+
+# fields shared by every logs panel. panels only fill in gridPos, targets and title.
+_LOGS_PANEL_TEMPLATE = {
+    "datasource": _LOKI_DATASOURCE,
+    "fieldConfig": {"defaults": {}, "overrides": []},
+    "options": {
+        "dedupStrategy": "none",
+        "enableInfiniteScrolling": False,
+        "enableLogDetails": True,
+        "prettifyLogMessage": False,
+        "showCommonLabels": False,
+        "showLabels": False,
+        "showTime": False,
+        "sortOrder": "Descending",
+        "wrapLogMessage": False,
+    },
+    "pluginVersion": "11.5.1",
+    "type": "logs",
+}
+
+_LOGS_TARGET_TEMPLATE = {
+    "datasource": _LOKI_DATASOURCE,
+    "editorMode": "builder",
+    "queryType": "range",
+    "refId": "A",
+    # TODO what is this?
+    "direction": None,
+}
+
+
+def _logs_selector(panel: ServiceLogsPanel) -> str:
+    return f'{{name="/{panel.service.name}"}}'
+
+
+def _build_logs_panel(panel: ServiceLogsPanel, grid_pos: Dict[str, int]) -> dict:
+    return {
+        **_LOGS_PANEL_TEMPLATE,
+        "gridPos": grid_pos,
+        #"id": panel_id,
+        "targets": [{**_LOGS_TARGET_TEMPLATE, "expr": _logs_selector(panel)}],
+        "title": panel.service.name,
+    }
+
+
+def _build_text_search_panel(panel: LogsTextSearch, grid_pos: Dict[str, int]) -> dict:
+    expr = f'{_logs_selector(panel)} |= "{panel.text}"'
+    return {
+        **_LOGS_PANEL_TEMPLATE,
+        "gridPos": grid_pos,
+        "targets": [{**_LOGS_TARGET_TEMPLATE, "expr": expr}],
+        "title": panel.title,
+    }
+
+
+def _build_count_plot(panel: LogsCountPlot, grid_pos: Dict[str, int]) -> "Graph":
+    from grafanalib.core import Graph, GridPos, Target
+
+    expr = f'{_logs_selector(panel)} |= "{panel.text}"'
+    return Graph(
+        title=panel.title,
+        gridPos=GridPos(**grid_pos),
+        targets=[
+            Target(
+                expr=f'count_over_time({expr}[{panel.period}])',
+                legendFormat="Count",
+                refId="A",
+            )
+        ],
+    )
+
+
+_PANEL_BUILDERS: Dict[type, Callable[[Any, Dict[str, int]], Any]] = {
+    ServiceLogsPanel: _build_logs_panel,
+    LogsTextSearch: _build_text_search_panel,
+    LogsCountPlot: _build_count_plot,
+}
+
+
+def _panel_builder(panel: ServiceLogsPanel) -> Callable[[Any, Dict[str, int]], Any]:
+    # walk the MRO so subclasses of the panel types use their base's builder.
+    for cls in type(panel).__mro__:
+        if (builder := _PANEL_BUILDERS.get(cls)) is not None:
+            return builder
+    raise TypeError(f"Unsupported panel type: {type(panel)}")
+
+
+def _layout_panels(panels_grid: List[ServiceLogsPanel | List[ServiceLogsPanel]]) -> list:
+    """Build the Grafana panels for each row of `panels_grid`, positioned on Grafana's 24 column grid."""
+    out_panels = []
+    y = 0
+    for row in panels_grid:
+        if not isinstance(row, (tuple, list)):
+            row = [row]
+        # find width fraction of each panel.
+        default_width_fr = 1 / len(row)
+        x = 0
+        row_height = 0
+        for panel in row:
+            if panel.width_fr is None:
+                panel.width_fr = default_width_fr
+            w = int(panel.width_fr * 24)
+            h = panel.height_no
+            out_panels.append(_panel_builder(panel)(panel, {"h": h, "w": w, "x": x, "y": y}))
+            x += w
+            row_height = max(row_height, h)
+        # the next row starts below the tallest panel in this row.
+        y += row_height
+    return out_panels
+
+
+def create_dashboard(title: str, panels_grid: List[ServiceLogsPanel | List[ServiceLogsPanel]]) -> "Dashboard":
+    from grafanalib.core import Annotation, Annotations, Dashboard, Time
+
     # check arg.
     for panels in panels_grid:
         if isinstance(panels, ServiceLogsPanel):
@@ -60,67 +177,7 @@ def create_dashboard(title: str, panels_grid: List[ServiceLogsPanel | List[Servi
             raise ValueError("panels_grid must be list[ServiceLogsPanel | List[ServiceLogsPanel]].")
         if len(panels) > 24:
             raise ValueError("Each row in panels_grid can have at most 24 panels.")
-    panels = []
-    y = 0
-    for panels in panels_grid:
-        if not isinstance(panels, (tuple,list)):
-            panels = [panels]
-        # find width fraction of each panel.
-        default_width_fr = 1 / len(panels)
-        x = 0
-        for panel in panels:
-            if panel.width_fr is None:
-                panel.width_fr = default_width_fr
-            expr ='{name="/{}"}'.format(panel.serice.name)
-            title = panel.service.name
-            if isinstance(panel, (LogsCountPlot, LogsTextSearch)):
-                title = panel.title
-                expr += f' |= "{panel.text}"'
-            if isinstance(panel, LogsCountPlot):
-                # TODO grid pos and other?
-                panels.append(Graph(
-                    title=title,
-                    targets=[
-                        Target(
-                            expr=f'count_over_time({expr}[{panel.period}])',
-                            legendFormat="Count",
-                            refId="A",
-                        )
-                    ],
-                ))
-            w = int(panel.width_fr * 24)
-            panels.append({
-                # TODO where to get uid?
-                "datasource": {"type": "loki", "uid": "P982945308D3682D1"},
-                "fieldConfig": {"defaults": {}, "overrides": []},
-                "gridPos": {"h": panel.height_no, "w": w, "x": x, "y": y},
-                #"id": panel_id,
-                "options": {
-                    "dedupStrategy": "none",
-                    "enableInfiniteScrolling": False,
-                    "enableLogDetails": True,
-                    "prettifyLogMessage": False,
-                    "showCommonLabels": False,
-                    "showLabels": False,
-                    "showTime": False,
-                    "sortOrder": "Descending",
-                    "wrapLogMessage": False,
-                },
-                "pluginVersion": "11.5.1",
-                "targets": [{
-                    "datasource": {"type": "loki", "uid": "P982945308D3682D1"},
-                    "editorMode": "builder",
-                    "expr": expr,
-                    "queryType": "range",
-                    "refId": "A",
-                    # TODO what is this?
-                    "direction": None,
-                }],
-                "title": title,
-                "type": "logs",
-            })
-            y += panel.height_no
-            x += w
+    out_panels = _layout_panels(panels_grid)
     return Dashboard(
         title=title,
         # TODO generate?
@@ -130,7 +187,7 @@ def create_dashboard(title: str, panels_grid: List[ServiceLogsPanel | List[Servi
         graphTooltip=0,
         id=1,
         links=[],
-        panels=panels,
+        panels=out_panels,
         preload=False,
         refresh="1m",
         schemaVersion=40,
@@ -157,22 +214,45 @@ def create_dashboard(title: str, panels_grid: List[ServiceLogsPanel | List[Servi
     ).auto_panel_ids()
 
 
+@cache
+def grafana_session() -> requests.Session:
+    """Get a requests session that reuses connections to Grafana across dashboard uploads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # every request to the dashboard API sends a JSON body.
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+def serialize_dashboard(dashboard: "Dashboard") -> bytes:
+    """Serialize a dashboard to the JSON payload expected by Grafana's dashboard API.
 
-def load_dashboard(dashboard):
-    dashboard_json = json.dumps(
-        {"dashboard": dashboard}, cls=DashboardEncoder, indent=2
-    ).encode("utf-8")
+    The payload can be kept and passed to `load_dashboard` repeatedly, so unchanged dashboards are only serialized once.
+    """
+    import orjson
+    from grafanalib._gen import DashboardEncoder
+
+    # orjson encodes directly to bytes; grafanalib objects are converted through the encoder's default hook.
+    return orjson.dumps({"dashboard": dashboard}, default=DashboardEncoder().default)
+
+
+def load_dashboard(dashboard: "Dashboard | bytes"):
+    # accept a payload from `serialize_dashboard` so repeated pushes skip re-serialization.
+    dashboard_json = (
+        dashboard if isinstance(dashboard, bytes) else serialize_dashboard(dashboard)
+    )
 
     # Assuming Grafana is running locally on port 3000
     grafana_url = "http://localhost:3000/api/dashboards/db"
     grafana_api_key = os.environ.get("GRAFANA_API_KEY")  # Set your Grafana API key as an environment variable
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {grafana_api_key}",
-    }
-
-    response = requests.post(grafana_url, data=dashboard_json, headers=headers)
+    response = grafana_session().post(
+        grafana_url,
+        data=dashboard_json,
+        headers={"Authorization": f"Bearer {grafana_api_key}"},
+    )
 
     if response.status_code == 200:
         print("Dashboard created/updated successfully")
@@ -65,14 +65,6 @@ class TasksDB:
         else:
             raise ValueError(f"Unsupported database dialect: {dialect}")
 
-        # Create the database schema if it does not exist
-        if schema_name:
-            with engine.begin() as conn:
-                if not conn.dialect.has_schema(conn, schema_name):
-                    logger.info("Creating schema '%s'", schema_name)
-                    conn.execute(sa.schema.CreateSchema(schema_name))
-
-        # Create the tables if they do not exist
         self.task_runs_table = sa.Table(
             "task_runs",
             sa_meta,
@@ -100,12 +92,16 @@ class TasksDB:
             sa.Column("type", sa.String),
             sa.Column("message", sa.String),
         )
-        for table in (
-            self.task_runs_table,
-            self.task_errors_table,
-        ):
-            with engine.begin() as conn:
-                table.create(conn, checkfirst=True)
+        # Create the database schema and tables if they do not exist, in one connection and transaction.
+        with engine.begin() as conn:
+            if schema_name and not conn.dialect.has_schema(conn, schema_name):
+                logger.info("Creating schema '%s'", schema_name)
+                conn.execute(sa.schema.CreateSchema(schema_name))
+            sa_meta.create_all(
+                conn,
+                tables=[self.task_runs_table, self.task_errors_table],
+                checkfirst=True,
+            )
 
     def upsert(self, table: sa.Table, **values):
         """
@@ -1,7 +1,7 @@
 import asyncio
 import re
 import sys
-from functools import wraps
+from functools import cache, wraps
 from typing import Dict, Sequence
 
 import click
@@ -10,6 +10,8 @@ from dynamic_imports import import_module_attr
 from taskflows import logger
 from taskflows.common import get_shutdown_handler
 
+_NUMBER_RE = re.compile(r"\d+(\.\d+)?")
+
 
 def parse_str_kwargs(kwargs: Sequence[str]) -> Dict[str, float | str]:
     """Parses string in the form 'key=value'"""
@@ -18,7 +20,7 @@ def parse_str_kwargs(kwargs: Sequence[str]) -> Dict[str, float | str]:
         if "=" not in pair:
             raise click.BadParameter(f"Invalid key=value pair: {pair}")
         key, value = pair.split("=", 1)
-        if re.match(r"(\d+(\.\d+)?)$", value):
+        if _NUMBER_RE.fullmatch(value):
             value = float(value)
         kwargs_dict[key] = value
     return kwargs_dict
@@ -26,11 +28,7 @@ def parse_str_kwargs(kwargs: Sequence[str]) -> Dict[str, float | str]:
 
 def async_entrypoint(blocking: bool = False, shutdown_on_exception: bool = True):
     def decorator(f):
-        loop = asyncio.get_event_loop_policy().get_event_loop()
-        sdh = get_shutdown_handler()
-        sdh.shutdown_on_exception = shutdown_on_exception
-
-        async def async_entrypoint_async(*args, **kwargs):
+        async def async_entrypoint_async(sdh, *args, **kwargs):
             logger.info("Running main task: %s", f)
             try:
                 await f(*args, **kwargs)
@@ -42,7 +40,12 @@ def async_entrypoint(blocking: bool = False, shutdown_on_exception: bool = True)
 
         @wraps(f)
         def wrapper(*args, **kwargs):
-            task = loop.create_task(async_entrypoint_async(*args, **kwargs))
+            # get the loop when the entrypoint is called, not when it is decorated (at import time),
+            # so a loop or loop policy set up after import is used.
+            loop = asyncio.get_event_loop_policy().get_event_loop()
+            sdh = get_shutdown_handler(loop)
+            sdh.shutdown_on_exception = shutdown_on_exception
+            task = loop.create_task(async_entrypoint_async(sdh, *args, **kwargs))
             if blocking:
                 loop.run_until_complete(task)
             else:
@@ -63,16 +66,22 @@ class CLIGroup:
         self.cli.add_command(cli)
 
     def add_lazy_sub_cli(self, name: str, cli_module: str, cli_variable: str):
-        self.commands[name] = lambda: import_module_attr(cli_module, cli_variable)
+        self.commands[name] = (cli_module, cli_variable)
 
     def run(self):
         if len(sys.argv) > 1 and (cmd_name := sys.argv[1]) in self.commands:
             # construct sub-command only as needed.
-            self.cli.add_command(self.commands[cmd_name](), name=cmd_name)
+            self.cli.add_command(_import_cli(*self.commands[cmd_name]), name=cmd_name)
         else:
             # For user can list all sub-commands.
-            for cmd_name, cmd_importer in self.commands.items():
-                self.cli.add_command(cmd_importer(), name=cmd_name)
+            for cmd_name, (cli_module, cli_variable) in self.commands.items():
+                self.cli.add_command(_import_cli(cli_module, cli_variable), name=cmd_name)
         self.cli()
+
+
+@cache
+def _import_cli(cli_module: str, cli_variable: str) -> Group:
+    """Import a CLI (once per module and variable, even if registered under multiple names)."""
+    return import_module_attr(cli_module, cli_variable)
         
 
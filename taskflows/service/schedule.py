@@ -7,7 +7,7 @@ from pydantic.dataclasses import dataclass
 class Schedule:
     """Base class for schedules."""
     def __init__(self, accuracy: str):
-        self.unit_entries = {f"AccuracySec={accuracy}"}
+        self.unit_entries = [f"AccuracySec={accuracy}"]
 
 @dataclass
 class Calendar(Schedule):
@@ -28,9 +28,9 @@ class Calendar(Schedule):
 
     def __post_init__(self):
         super().__init__(self.accuracy)
-        self.unit_entries.add(f"OnCalendar={self.schedule}")
+        self.unit_entries.append(f"OnCalendar={self.schedule}")
         if self.persistent:
-            self.unit_entries.add("Persistent=true")
+            self.unit_entries.append("Persistent=true")
 
     @classmethod
     def from_datetime(cls, dt: datetime):
@@ -58,14 +58,14 @@ class Periodic(Schedule):
         # start on
         if self.start_on == "boot":
             # start 1 second after boot.
-            self.unit_entries.add("OnBootSec=1")
+            self.unit_entries.append("OnBootSec=1")
         elif self.start_on == "login":
             # start 1 second after the service manager is started (which is on login).
-            self.unit_entries.add("OnStartupSec=1")
+            self.unit_entries.append("OnStartupSec=1")
         # relative_to
         if self.relative_to == "start":
             # defines a timer relative to when the unit the timer unit is activating was last activated.
-            self.unit_entries.add(f"OnUnitActiveSec={self.period}s")
+            self.unit_entries.append(f"OnUnitActiveSec={self.period}s")
         elif self.relative_to == "finish":
             # defines a timer relative to when the unit the timer unit is activating was last deactivated.
-            self.unit_entries.add(f"OnUnitInactiveSec={self.period}s")
+            self.unit_entries.append(f"OnUnitInactiveSec={self.period}s")
@@ -1,12 +1,17 @@
+import logging
 import os
 import re
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from functools import cache
+from functools import cache, lru_cache
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
 from pprint import pformat
-from typing import Callable, Dict, List, Literal, Optional, Sequence, Set, Union
+from time import monotonic
+from typing import Callable, Dict, List, Literal, Optional, Sequence, Tuple, Union
 
 import cloudpickle
 import dbus
@@ -24,9 +29,12 @@ ServicesT = Union[ServiceT, Sequence[ServiceT]]
 
 systemd_dir = Path.home().joinpath(".config", "systemd", "user")
 
+# docker container started/stopped by a unit's commands.
+_DOCKER_CMD_RE = re.compile(rb"docker (?:start|stop) ([\w-]+)")
 
-def extract_service_name(unit: str | Path) -> List[str]:
-    return re.sub(f"^{_SYSTEMD_FILE_PREFIX}", "", Path(unit).stem)
+
+def extract_service_name(unit: str | Path) -> str:
+    return Path(unit).stem.removeprefix(_SYSTEMD_FILE_PREFIX)
 
 @dataclass
 class RestartPolicy:
@@ -50,20 +58,19 @@ class RestartPolicy:
     window: Optional[int] = None
 
     @property
-    def unit_entries(self) -> Set[str]:
-        entries = set()
+    def unit_entries(self) -> List[str]:
         # 0 allows unlimited attempts.
         window = self.window or 0
-        entries.add(f"StartLimitIntervalSec={window}")
+        entries = [f"StartLimitIntervalSec={window}"]
         if self.max_attempts:
-            entries.add(f"StartLimitBurst={self.max_attempts}")
+            entries.append(f"StartLimitBurst={self.max_attempts}")
         return entries
 
     @property
-    def service_entries(self) -> Set[str]:
-        entries = {f"Restart={self.condition}"}
+    def service_entries(self) -> List[str]:
+        entries = [f"Restart={self.condition}"]
         if self.delay:
-            entries.add(f"RestartSec={self.delay}")
+            entries.append(f"RestartSec={self.delay}")
         return entries
 
 
@@ -167,6 +174,23 @@ class Service:
     # enable the service to start automatically on boot.
     enabled: bool = False
 
+    # (attribute, [Unit] key) for each dependency setting that takes a list of units.
+    _UNIT_DEPENDENCY_ENTRIES = (
+        ("start_after", "After"),
+        ("start_before", "Before"),
+        ("conflicts", "Conflicts"),
+        ("on_success", "OnSuccess"),
+        ("on_failure", "OnFailure"),
+        ("part_of", "PartOf"),
+        ("wants", "Wants"),
+        ("upholds", "Upholds"),
+        ("requires", "Requires"),
+        ("requisite", "Requisite"),
+        ("binds_to", "BindsTo"),
+        ("propagate_stop_to", "PropagatesStopTo"),
+        ("propagate_stop_from", "StopPropagatedFrom"),
+    )
+
     def __post_init__(self):
         if self.venv is not None:
             if self.start_command:
@@ -177,6 +201,8 @@ class Service:
                 self.restart_command = self.venv.create_env_command(
                     self.restart_command
                 )
+        # file names are derived from this on every unit file lookup, so build it once.
+        self._base_file_stem = f"{_SYSTEMD_FILE_PREFIX}{self.name.replace(' ', '_')}"
         self._set_unit_and_service_entries()
 
     @property
@@ -258,12 +284,10 @@ class Service:
         ):
             if schedule is None:
                 continue
-            timer = set()
-            if isinstance(schedule, (list, tuple)):
-                for sched in schedule:
-                    timer.update(sched.unit_entries)
-            else:
-                timer.update(schedule.unit_entries)
+            if not isinstance(schedule, (list, tuple)):
+                schedule = [schedule]
+            # drop duplicate entries while keeping a stable order, so unchanged schedules write identical files.
+            timer = dict.fromkeys(chain.from_iterable(sched.unit_entries for sched in schedule))
             content = [
                 "[Unit]",
                 f"Description={'stop ' if is_stop_timer else ''}timer for {self.name}",
@@ -279,70 +303,45 @@ class Service:
             if not isinstance(args, (list, tuple)):
                 args = [args]
             return " ".join(args)
-        unit = set()
-        service = {
+        unit = []
+        service = [
             f"ExecStart={self.start_command}",
             f"KillSignal={self.kill_signal}",
             "TimeoutStopSec=120s",
-        }
+        ]
         if self.stop_command:
-            service.add(f"ExecStop={self.stop_command}")
+            service.append(f"ExecStop={self.stop_command}")
         if self.restart_command:
-            service.add(f"ExecReload={self.restart_command}")
+            service.append(f"ExecReload={self.restart_command}")
         # TODO ExecStopPost?
         if self.working_directory:
-            service.add(f"WorkingDirectory={self.working_directory}")
+            service.append(f"WorkingDirectory={self.working_directory}")
         if self.timeout:
-            service.add(f"RuntimeMaxSec={self.timeout}")
+            service.append(f"RuntimeMaxSec={self.timeout}")
         # TODO forward to docker container.
         if self.env_file:
-            service.add(f"EnvironmentFile={self.env_file}")
+            service.append(f"EnvironmentFile={self.env_file}")
         if self.env:
-            service.add(
+            service.append(
                 "\n".join([f'Environment="{k}={v}"' for k, v in self.env.items()])
             )
         if self.description:
-            unit.add(f"Description={self.description}")
-        if self.start_after:
-            unit.add(f"After={join(self.start_after)}")
-        if self.start_before:
-            unit.add(f"Before={join(self.start_before)}")
-        if self.conflicts:
-            unit.add(f"Conflicts={join(self.conflicts)}")
-        if self.on_success:
-            unit.add(f"OnSuccess={join(self.on_success)}")
-        if self.on_failure:
-            unit.add(f"OnFailure={join(self.on_failure)}")
-        if self.part_of:
-            unit.add(f"PartOf={join(self.part_of)}")
-        if self.wants:
-            unit.add(f"Wants={join(self.wants)}")
-        if self.upholds:
-            unit.add(f"Upholds={join(self.upholds)}")
-        if self.requires:
-            unit.add(f"Requires={join(self.requires)}")
-        if self.requisite:
-            unit.add(f"Requisite={join(self.requisite)}")
-        if self.conflicts:
-            unit.add(f"Conflicts={join(self.conflicts)}")
-        if self.binds_to:
-            unit.add(f"BindsTo={join(self.binds_to)}")
-        if self.propagate_stop_to:
-            unit.add(f"PropagatesStopTo={join(self.propagate_stop_to)}")
-        if self.propagate_stop_from:
-            unit.add(f"StopPropagatedFrom={join(self.propagate_stop_from)}")
+            unit.append(f"Description={self.description}")
+        for attr, key in self._UNIT_DEPENDENCY_ENTRIES:
+            if units := getattr(self, attr):
+                unit.append(f"{key}={join(units)}")
         if self.hardware_constraints:
             hcs = self.hardware_constraints if isinstance(self.hardware_constraints, (list, tuple)) else [self.hardware_constraints]
             for hc in hcs:
-                unit.update(hc.unit_entries)
+                unit.extend(hc.unit_entries)
         if self.system_load_constraints:
             slcs = self.system_load_constraints if isinstance(self.system_load_constraints, (list, tuple)) else [self.system_load_constraints]
             for slc in slcs:
-                unit.update(slc.unit_entries) 
+                unit.extend(slc.unit_entries) 
         if self.restart_policy not in ("no",None):
             rp = RestartPolicy(condition=self.restart_policy) if isinstance(self.restart_policy, str) else self.restart_policy
-            unit.update(rp.unit_entries)
-            service.update(rp.service_entries)
+            unit.extend(rp.unit_entries)
+            service.extend(rp.service_entries)
         self.unit_entries = unit
         self.service_entries = service
 
@@ -355,7 +354,7 @@ class Service:
 
     @property
     def base_file_stem(self) -> str:
-        return f"{_SYSTEMD_FILE_PREFIX}{self.name.replace(' ', '_')}"
+        return self._base_file_stem
 
     def _write_service_file(
         self,
@@ -363,12 +362,14 @@ class Service:
         service: Optional[List[str]] = None,
         is_stop_unit: bool = False,
     ):
+        # entries are kept in insertion order so unit files are written identically for an unchanged service.
+        # dict.fromkeys drops any duplicates (e.g. repeated constraints).
         content = []
         if unit:
-            content += ["[Unit]", *unit]
+            content += ["[Unit]", *dict.fromkeys(unit)]
         content += [
             "[Service]",
-            *service,
+            *dict.fromkeys(service),
             "[Install]",
             "WantedBy=default.target",
         ]
@@ -391,7 +392,10 @@ class Service:
             logger.warning("Replacing existing unit: %s", file)
         else:
             logger.info("Creating new unit: %s", file)
-        file.write_text(content)
+        # write to a temporary file and rename it over the unit, so systemd never reads a partially written unit.
+        tmp_file = file.with_name(f"{file.name}.tmp")
+        tmp_file.write_bytes(content.encode())
+        os.replace(tmp_file, file)
         return str(file)
 
     def __repr__(self):
@@ -445,22 +449,22 @@ class DockerStartService(Service):
         )
         # use same cgroup for container and service.
         self.slice = f"{name}.slice"
-        self.service_entries.add(f"Slice={self.slice}")
+        self.service_entries.append(f"Slice={self.slice}")
         # let docker handle the signal. TODO do this for anything that provides stop_command?
-        self.service_entries.add("KillMode=none")
+        self.service_entries.append("KillMode=none")
         # not relevant with KillMode=none
         self.service_entries.remove("KillSignal=SIGTERM")
         # SIGTERM from docker stop
-        self.service_entries.add("SuccessExitStatus=0 143")
+        self.service_entries.append("SuccessExitStatus=0 143")
         # SIGKILL and docker error code.
-        self.service_entries.add("RestartForceExitStatus=137 255")
-        self.service_entries.add("Delegate=yes")
-        self.service_entries.add("TasksMax=infinity")
+        self.service_entries.append("RestartForceExitStatus=137 255")
+        self.service_entries.append("Delegate=yes")
+        self.service_entries.append("TasksMax=infinity")
         # drop the duplicate log stream in journalctl
-        self.service_entries.add("StandardOutput=null")
-        self.service_entries.add("StandardError=null")
+        self.service_entries.append("StandardOutput=null")
+        self.service_entries.append("StandardError=null")
         # blocks until it is fully stopped
-        self.service_entries.add(f"ExecStopPost=docker wait {name}")
+        self.service_entries.append(f"ExecStopPost=docker wait {name}")
 
     def create(self, defer_reload: bool = False):
         super().create(defer_reload=defer_reload)
@@ -520,6 +524,7 @@ def systemd_manager():
 
 def reload_unit_files():
     systemd_manager().Reload()
+    clear_unit_file_cache()
 
 
 def escape_path(path) -> str:
@@ -527,63 +532,74 @@ def escape_path(path) -> str:
     return systemd_manager().EscapePath(path)
 
 
+_missing_dt = datetime(1970, 1, 1, 0, 0, 0)
+
+
+def _timestamp_to_dt(timestamp) -> Optional[datetime]:
+    """Convert a systemd microsecond timestamp to a datetime (None if unset)."""
+    try:
+        dt = datetime.fromtimestamp(timestamp / 1_000_000)
+        if dt == _missing_dt:
+            return None
+        return dt
+    except ValueError:
+        # "year 586524 is out of range"
+        return None
+
+
 def get_schedule_info(unit: str):
     """Get the schedule information for a unit."""
+    return _get_schedule_info(unit, systemd_manager())
+
+
+def get_schedules_info(units: Sequence[str]) -> Dict[str, Dict]:
+    """Get the schedule information for multiple units, keyed by unit.
+
+    The manager proxy is looked up once and shared by all units.
+    Units are loaded by systemd as a side effect, so they will be listed by `get_units`.
+    """
+    manager = systemd_manager()
+    return {unit: _get_schedule_info(unit, manager) for unit in units}
+
+
+@lru_cache(maxsize=256)
+def _unit_properties(unit_path: str) -> dbus.Interface:
+    """Get the (cached) D-Bus properties interface of a unit object. A unit's object path is fixed by its name."""
+    unit = session_dbus().get_object("org.freedesktop.systemd1", unit_path)
+    return dbus.Interface(unit, dbus_interface="org.freedesktop.DBus.Properties")
+
+
+def _get_schedule_info(unit: str, manager: dbus.Interface):
     unit_stem = Path(unit).stem
     if not unit_stem.startswith(_SYSTEMD_FILE_PREFIX):
         unit_stem = f"{_SYSTEMD_FILE_PREFIX}{unit_stem}"
-    manager = systemd_manager()
-    bus = session_dbus()
     # service_path = manager.GetUnit(f"{unit_stem}.service")
     service_path = manager.LoadUnit(f"{unit_stem}.service")
-    service = bus.get_object("org.freedesktop.systemd1", service_path)
-    service_properties = dbus.Interface(
-        service, dbus_interface="org.freedesktop.DBus.Properties"
-    )
+    service_properties = _unit_properties(service_path)
+    # fetch all properties of each interface in one round trip instead of one Get per property.
+    unit_props = service_properties.GetAll("org.freedesktop.systemd1.Unit")
     schedule = {
         # timestamp of the last time a unit entered the active state.
-        "Last Start": service_properties.Get(
-            "org.freedesktop.systemd1.Unit", "ActiveEnterTimestamp"
-        ),
+        "Last Start": unit_props["ActiveEnterTimestamp"],
         # timestamp of the last time a unit exited the active state.
-        "Last Finish": service_properties.Get(
-            "org.freedesktop.systemd1.Unit", "ActiveExitTimestamp"
-        ),
+        "Last Finish": unit_props["ActiveExitTimestamp"],
     }
     timer_path = manager.LoadUnit(f"{unit_stem}.timer")
-    timer = bus.get_object("org.freedesktop.systemd1", timer_path)
-    timer_properties = dbus.Interface(
-        timer, dbus_interface="org.freedesktop.DBus.Properties"
-    )
-    schedule["Next Start"] = timer_properties.Get(
-        "org.freedesktop.systemd1.Timer", "NextElapseUSecRealtime"
-    )
+    timer_properties = _unit_properties(timer_path)
+    timer_props = timer_properties.GetAll("org.freedesktop.systemd1.Timer")
+    schedule["Next Start"] = timer_props["NextElapseUSecRealtime"]
     # "org.freedesktop.systemd1.Timer", "LastTriggerUSec"
-    missing_dt = datetime(1970, 1, 1, 0, 0, 0)
-
-    def timestamp_to_dt(timestamp):
-        try:
-            dt = datetime.fromtimestamp(timestamp / 1_000_000)
-            if dt == missing_dt:
-                return None
-            return dt
-        except ValueError:
-            # "year 586524 is out of range"
-            return None
-
-    schedule = {field: timestamp_to_dt(val) for field, val in schedule.items()}
+    schedule = {field: _timestamp_to_dt(val) for field, val in schedule.items()}
     # TimersCalendar contains an array of structs that contain information about all realtime/calendar timers of this timer unit. The structs contain a string identifying the timer base, which may only be "OnCalendar" for now; the calendar specification string; the next elapsation point on the CLOCK_REALTIME clock, relative to its epoch.
     timers_cal = []
     # for timer_type in ("TimersMonotonic", "TimersCalendar"):
-    for timer in timer_properties.Get(
-        "org.freedesktop.systemd1.Timer", "TimersCalendar"
-    ):
+    for timer in timer_props["TimersCalendar"]:
         base, spec, next_start = timer
         timers_cal.append(
             {
                 "base": base,
                 "spec": spec,
-                "next_start": timestamp_to_dt(next_start),
+                "next_start": _timestamp_to_dt(next_start),
             }
         )
     schedule["Timers Calendar"] = timers_cal
@@ -593,15 +609,13 @@ def get_schedule_info(unit: str):
         schedule["Next Start"] = min(next_start)
     # TimersMonotonic contains an array of structs that contain information about all monotonic timers of this timer unit. The structs contain a string identifying the timer base, which is one of "OnActiveUSec", "OnBootUSec", "OnStartupUSec", "OnUnitActiveUSec", or "OnUnitInactiveUSec" which correspond to the settings of the same names in the timer unit files; the microsecond offset from this timer base in monotonic time; the next elapsation point on the CLOCK_MONOTONIC clock, relative to its epoch.
     timers_mono = []
-    for timer in timer_properties.Get(
-        "org.freedesktop.systemd1.Timer", "TimersMonotonic"
-    ):
+    for timer in timer_props["TimersMonotonic"]:
         base, offset, next_start = timer
         timers_mono.append(
             {
                 "base": base,
                 "offset": offset,
-                "next_start": timestamp_to_dt(next_start),
+                "next_start": _timestamp_to_dt(next_start),
             }
         )
     schedule["Timers Monotonic"] = timers_mono
@@ -610,38 +624,82 @@ def get_schedule_info(unit: str):
 
 def get_unit_files(
     unit_type: Optional[Literal["service", "timer"]] = None,
-    match: Optional[str] = None,
+    match: Optional[str | Sequence[str]] = None,
     states: Optional[str | Sequence[str]] = None,
 ) -> List[str]:
-    """Get a list of paths of taskflow unit files."""
+    """Get a list of paths of taskflow unit files.
+
+    `match` may be a sequence of names/patterns, which are all looked up in a single call.
+    """
     file_states = get_unit_file_states(unit_type=unit_type, match=match, states=states)
     return list(file_states.keys())
 
 
 def get_unit_file_states(
     unit_type: Optional[Literal["service", "timer"]] = None,
-    match: Optional[str] = None,
+    match: Optional[str | Sequence[str]] = None,
     states: Optional[str | Sequence[str]] = None,
 ) -> Dict[str, str]:
     """Map taskflow unit file path to unit state."""
-    states = states or []
-    pattern = _make_unit_match_pattern(unit_type=unit_type, match=match)
-    files = list(systemd_manager().ListUnitFilesByPatterns(states, [pattern]))
-    logger.debug("Found %i units matching: %s", len(files), pattern)
+    if isinstance(states, str):
+        states = [states]
+    # copy so callers can't mutate the cached result.
+    return dict(
+        _list_unit_file_states(unit_type, _as_matches(match), tuple(states or ()))
+    )
+
+
+# unit file lookups are reused for this many seconds, so repeated queries in quick succession share one D-Bus call
+# and long-running processes never see results older than this.
+_UNIT_FILE_CACHE_TTL = 1.0
+_unit_file_cache: Dict[tuple, Tuple[float, Dict[str, str]]] = {}
+_get_first, _get_second = itemgetter(0), itemgetter(1)
+
+
+def _list_unit_file_states(
+    unit_type: Optional[Literal["service", "timer"]],
+    matches: Tuple[Optional[str], ...],
+    states: Tuple[str, ...],
+) -> Dict[str, str]:
+    if not matches:
+        return {}
+    key = (unit_type, matches, states)
+    now = monotonic()
+    if (cached := _unit_file_cache.get(key)) and now - cached[0] < _UNIT_FILE_CACHE_TTL:
+        return cached[1]
+    patterns = _make_unit_match_patterns(unit_type=unit_type, matches=matches)
+    files = list(systemd_manager().ListUnitFilesByPatterns(list(states), patterns))
+    logger.debug("Found %i units matching: %s", len(files), patterns)
     if not files:
-        logger.error("No taskflow unit files found matching: %s", pattern)
-    return {str(file): str(state) for file, state in files}
+        logger.error("No taskflow unit files found matching: %s", patterns)
+    # keep the per-entry conversion in C rather than a Python-level comprehension.
+    file_states = dict(zip(map(str, map(_get_first, files)), map(str, map(_get_second, files))))
+    if len(_unit_file_cache) >= 32:
+        # drop entries from other queries rather than growing without bound.
+        _unit_file_cache.clear()
+    _unit_file_cache[key] = (now, file_states)
+    return file_states
+
+
+def clear_unit_file_cache():
+    """Clear cached unit file lookups. Call after unit files are created, removed, enabled or disabled."""
+    _unit_file_cache.clear()
 
 
 def get_units(
     unit_type: Optional[Literal["service", "timer"]] = None,
-    match: Optional[str] = None,
+    match: Optional[str | Sequence[str]] = None,
     states: Optional[str | Sequence[str]] = None,
 ) -> List[Dict[str, str]]:
-    """Get metadata for taskflow units."""
+    """Get metadata for taskflow units.
+
+    `match` may be a sequence of names/patterns, which are all looked up in a single call.
+    """
+    if not (matches := _as_matches(match)):
+        return []
     states = states or []
-    pattern = _make_unit_match_pattern(unit_type=unit_type, match=match)
-    files = list(systemd_manager().ListUnitsByPatterns(states, [pattern]))
+    patterns = _make_unit_match_patterns(unit_type=unit_type, matches=matches)
+    files = list(systemd_manager().ListUnitsByPatterns(states, patterns))
     fields = [
         "unit_name",
         "description",
@@ -654,41 +712,67 @@ def get_units(
         "job_type",
         "job_path",
     ]
-    units = [{k: str(v) for k, v in zip(fields, f)} for f in files]
-    logger.debug("Found %i units matching: %s", len(units), pattern)
+    # D-Bus strings and object paths already subclass str, so only the numeric job id needs converting.
+    units = [dict(zip(fields, f)) for f in files]
+    for unit in units:
+        unit["job_id"] = str(unit["job_id"])
+    logger.debug("Found %i units matching: %s", len(units), patterns)
     return units
 
 
+def _as_matches(match: Optional[str | Sequence[str]]) -> Tuple[Optional[str], ...]:
+    """Normalize a single match or a sequence of matches to a (hashable) tuple."""
+    if match is None or isinstance(match, str):
+        return (match,)
+    return tuple(match)
+
+
+def _make_unit_match_patterns(
+    unit_type: Optional[Literal["service", "timer"]],
+    matches: Sequence[Optional[str]],
+) -> List[str]:
+    # systemd accepts a list of patterns, so all matches are looked up in one call.
+    return list(
+        dict.fromkeys(
+            _make_unit_match_pattern(unit_type=unit_type, match=m) for m in matches
+        )
+    )
+
+
 def _make_unit_match_pattern(
     unit_type: Optional[Literal["service", "timer"]] = None, match: Optional[str] = None
 ) -> str:
     pattern = match or "*"
-    if unit_type and not pattern.endswith(f".{unit_type}"):
-        pattern += f".{unit_type}"
-    else:
+    if not unit_type:
         pattern += ".*"
+    elif not pattern.endswith(f".{unit_type}"):
+        pattern += f".{unit_type}"
     if _SYSTEMD_FILE_PREFIX not in pattern:
         pattern = f"*{_SYSTEMD_FILE_PREFIX}{pattern}"
-    return re.sub(r"\*{2,}", "*", pattern)
+    # collapse runs of wildcards. patterns are short, so plain replacement beats a regex.
+    while "**" in pattern:
+        pattern = pattern.replace("**", "*")
+    return pattern
 
 
 def _start_service(files: Sequence[str]):
-    mgr = systemd_manager()
+    # bind the proxy method once; every attribute access on a D-Bus interface builds a new method object.
+    start_unit = systemd_manager().StartUnit
     for sf in files:
         sf = os.path.basename(sf)
         if sf.startswith("stop-"):
             continue
         logger.info("Running: %s", sf)
-        mgr.StartUnit(sf, "replace")
+        start_unit(sf, "replace")
 
 
 def _stop_service(files: Sequence[str]):
-    mgr = systemd_manager()
+    stop_unit = systemd_manager().StopUnit
     for sf in files:
         sf = os.path.basename(sf)
         logger.info("Stopping: %s", sf)
         try:
-            mgr.StopUnit(sf, "replace")
+            stop_unit(sf, "replace")
         except dbus.exceptions.DBusException as err:
             logger.warning("Could not stop %s: (%s) %s", sf, type(err), err)
 
@@ -700,18 +784,19 @@ def _restart_service(files: Sequence[str]):
     units = [os.path.basename(f) for f in files]
     # don't restart "stop" units
     units = [u for u in units if u.startswith("taskflow-")]
-    mgr = systemd_manager()
+    restart_unit = systemd_manager().RestartUnit
     for sf in units:
         logger.info("Restarting: %s", sf)
         try:
-            mgr.RestartUnit(sf, "replace")
+            restart_unit(sf, "replace")
         except dbus.exceptions.DBusException as err:
             logger.warning("Could not restart %s: (%s) %s", sf, type(err), err)
 
 
 def _enable_service(files: Sequence[str]):
     mgr = systemd_manager()
-    logger.info("Enabling: %s", pformat(files))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Enabling: %s", pformat(files))
 
     def enable_files(files, is_retry=False):
         try:
@@ -725,12 +810,14 @@ def _enable_service(files: Sequence[str]):
                     enable_files([file], is_retry=True)
 
     enable_files(files)
+    clear_unit_file_cache()
 
 
 def _disable_service(files: Sequence[str]):
     mgr = systemd_manager()
     files = [os.path.basename(f) for f in files]
-    logger.info("Disabling: %s", pformat(files))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Disabling: %s", pformat(files))
 
     def disable_files(files, is_retry=False):
         try:
@@ -746,6 +833,19 @@ def _disable_service(files: Sequence[str]):
                     disable_files([file], is_retry=True)
 
     disable_files(files)
+    clear_unit_file_cache()
+
+
+def _unit_docker_container(unit_file: str | Path) -> Optional[str]:
+    """Name of the docker container started or stopped by a unit file's commands, if any."""
+    with open(unit_file, "rb") as f:
+        # stop at the first matching line.
+        for line in f:
+            # most lines don't run docker, so check for the literal before running the regex.
+            # matching on bytes skips decoding the file.
+            if b"docker " in line and (match := _DOCKER_CMD_RE.search(line)):
+                return match.group(1).decode()
+    return None
 
 
 def _remove_service(
@@ -753,8 +853,7 @@ def _remove_service(
     timer_files: Sequence[str]
 ):
     def valid_file_paths(files):
-        files = [Path(f) for f in files]
-        return [f for f in files if f.is_file()]
+        return [f for f in map(os.fspath, files) if os.path.isfile(f)]
 
     service_files = valid_file_paths(service_files)
     timer_files = valid_file_paths(timer_files)
@@ -763,24 +862,23 @@ def _remove_service(
     _stop_service(files)
     _disable_service(files)
     container_names = set()
-    mgr = systemd_manager()
+    clean_unit = systemd_manager().CleanUnit
     for srv_file in service_files:
         logger.info("Cleaning cache and runtime directories: %s.", srv_file)
         try:
             # the possible values are "configuration", "state", "logs", "cache", "runtime", "fdstore", and "all".
-            mgr.CleanUnit(srv_file.name, ["all"])
+            clean_unit(os.path.basename(srv_file), ["all"])
         except dbus.exceptions.DBusException as err:
             logger.warning("Could not clean %s: (%s) %s", srv_file, type(err), err)
-        container_name = re.search(
-            r"docker (?:start|stop) ([\w-]+)", srv_file.read_text()
-        )
-        if container_name:
-            container_names.add(container_name.group(1))
-    for cname in container_names:
-        delete_docker_container(cname)
+        if container_name := _unit_docker_container(srv_file):
+            container_names.add(container_name)
+    if container_names:
+        # each removal waits on the Docker daemon, so remove the containers concurrently.
+        with ThreadPoolExecutor(max_workers=min(len(container_names), 8)) as executor:
+            list(executor.map(delete_docker_container, container_names))
     for srv in service_files:
         files.extend(taskflows_data_dir.glob(f"{extract_service_name(srv)}#*.pickle"))
-    for file in files:
-        logger.info("Deleting %s", file)
-        file.unlink()
+    for path in map(os.fspath, files):
+        logger.info("Deleting %s", path)
+        os.unlink(path)
     reload_unit_files()
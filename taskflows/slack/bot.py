@@ -1,8 +1,11 @@
 import io
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stderr, redirect_stdout
+from typing import Callable, List
 
+import click
 from slack_bolt import Ack, App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from slack_sdk.errors import SlackApiError
@@ -12,12 +15,23 @@ from taskflows.admin import cli as admin_cli
 
 from .config import config
 
+_ANSI_ESCAPE_RE = re.compile(r'\x1b\[[0-9;]*m')
+_MENTION_RE = re.compile(r'<@[A-Z0-9]+>')
+# an escape sequence cut off at the end of truncated output.
+_PARTIAL_ANSI_ESCAPE_RE = re.compile(r'\x1b(?:\[[0-9;]*)?$')
+# Slack recommends keeping message text under 4000 characters, so command output is cut to this length.
+_MAX_OUTPUT_CHARS = 3900
+
 # Initialize the Slack app
 app = App(
     token=config.bot_token,
     signing_secret=config.signing_secret
 )
 
+# commands run off the listener thread so handlers return right after acknowledging the request.
+# output is captured by redirecting the process-wide stdout/stderr, so commands must run one at a time.
+_command_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="taskflows-slack-command")
+
 
 def is_authorized(user_id: str, channel_id: str) -> bool:
     """Check if the user is authorized to use this bot."""
@@ -34,28 +48,60 @@ def is_authorized(user_id: str, channel_id: str) -> bool:
 
 def format_for_slack(text: str) -> str:
     """Format the output for Slack."""
-    # Strip ANSI color codes
-    text = re.sub(r'\x1b\[[0-9;]*m', '', text)
+    # Truncate first so the regex below only scans what will be sent.
+    if len(text) > _MAX_OUTPUT_CHARS:
+        # the cut can split an escape sequence, which the regex below would not match.
+        text = _PARTIAL_ANSI_ESCAPE_RE.sub('', text[:_MAX_OUTPUT_CHARS]) + "...\n[Output truncated]"
+    # Strip ANSI color codes (output captured from the CLI rarely has any, so skip the regex when there's no escape)
+    if '\x1b' in text:
+        text = _ANSI_ESCAPE_RE.sub('', text)
     return f"```\n{text}\n```" if text else "Command executed successfully."
 
 
+def _subcommand_names(args: List[str]) -> List[str]:
+    """Names of the admin CLI subcommands `args` would run.
+
+    The CLI is a chained group, so each subcommand's arguments are parsed the way Click does to find where the next
+    subcommand starts. Parsing is resilient, so invalid arguments are left for the actual run to report.
+    """
+    ctx = click.Context(admin_cli, info_name="tf", resilient_parsing=True)
+    names = []
+    while args:
+        name, cmd, args = admin_cli.resolve_command(ctx, args)
+        if cmd is None:
+            break
+        names.append(cmd.name)
+        sub_ctx = cmd.make_context(
+            name,
+            args,
+            parent=ctx,
+            allow_extra_args=True,
+            allow_interspersed_args=False,
+            resilient_parsing=True,
+        )
+        args = sub_ctx.args
+    return names
+
+
 def run_command(command_string: str) -> str:
     """Run a taskflows CLI command and return the output."""
     # Split the command string into args
     args = command_string.strip().split()
+    # `logs` follows the journal and never returns, which would block every later command.
+    if "logs" in _subcommand_names(args):
+        return "Error: `logs` follows the journal and can't be run from Slack."
     
-    # Capture stdout and stderr
+    # Capture stdout and stderr (in one buffer, so messages stay in the order they were written)
     output_buffer = io.StringIO()
-    error_buffer = io.StringIO()
     
     try:
-        with redirect_stdout(output_buffer), redirect_stderr(error_buffer):
+        with redirect_stdout(output_buffer), redirect_stderr(output_buffer):
             # Call the Click CLI with the provided arguments
             admin_cli.main(args=args, standalone_mode=False)
     except SystemExit as e:
         # Catch the SystemExit that Click raises
         if e.code != 0:
-            return f"Error: {error_buffer.getvalue() or 'Command failed with exit code ' + str(e.code)}"
+            return f"Error: {output_buffer.getvalue() or 'Command failed with exit code ' + str(e.code)}"
     except Exception as e:
         logger.exception(f"Error executing command: {command_string}")
         return f"Error: {str(e)}"
@@ -63,6 +109,21 @@ def run_command(command_string: str) -> str:
     return output_buffer.getvalue() or "Command executed successfully."
 
 
+def _run_and_update(client, channel_id: str, ts: str, command_text: str, post: Callable[[str], object]):
+    """Run a command and replace the message with timestamp `ts` with its result (or `post` the result if that fails)."""
+    # this runs on the command executor, where an uncaught exception would be silently stored on the future.
+    try:
+        result = run_command(command_text)
+        text = f"Command: `tf {command_text}`\n\n{format_for_slack(result)}"
+        try:
+            client.chat_update(channel=channel_id, ts=ts, text=text)
+        except SlackApiError as e:
+            logger.error(f"Error updating message: {e}")
+            post(text)
+    except Exception:
+        logger.exception(f"Error responding to command: {command_text}")
+
+
 @app.command("/tf")
 def handle_tf_command(ack: Ack, command, client):
     """Handle /tf slash command."""
@@ -82,7 +143,7 @@ def handle_tf_command(ack: Ack, command, client):
     if not command_text:
         client.chat_postMessage(
             channel=channel_id,
-            text="Please provide a command. Available commands: history, list, status, logs, create, start, stop, restart, enable, disable, remove, show"
+            text="Please provide a command. Available commands: history, list, status, create, start, stop, restart, enable, disable, remove, show"
         )
         return
     
@@ -92,22 +153,15 @@ def handle_tf_command(ack: Ack, command, client):
         text=f"Running command: `tf {command_text}`..."
     )
     
-    # Run the command
-    result = run_command(command_text)
-    
-    # Update the message with the result
-    try:
-        client.chat_update(
-            channel=channel_id,
-            ts=response["ts"],
-            text=f"Command: `tf {command_text}`\n\n{format_for_slack(result)}"
-        )
-    except SlackApiError as e:
-        logger.error(f"Error updating message: {e}")
-        client.chat_postMessage(
-            channel=channel_id,
-            text=f"Command: `tf {command_text}`\n\n{format_for_slack(result)}"
-        )
+    # Run the command and update the message with the result
+    _command_executor.submit(
+        _run_and_update,
+        client,
+        channel_id,
+        response["ts"],
+        command_text,
+        lambda text: client.chat_postMessage(channel=channel_id, text=text),
+    )
 
 
 @app.event("app_mention")
@@ -126,7 +180,7 @@ def handle_app_mention(event, say, client):
     
     text = event["text"]
     # Extract command: remove the app mention
-    command_text = re.sub(r'<@[A-Z0-9]+>', '', text).strip()
+    command_text = _MENTION_RE.sub('', text).strip()
     
     if not command_text:
         say("How can I help you? Try `@TaskFlows status` or other commands.")
@@ -135,19 +189,8 @@ def handle_app_mention(event, say, client):
     # Post a thinking message
     response = say(f"Running command: `tf {command_text}`...")
     
-    # Run the command
-    result = run_command(command_text)
-    
-    # Update the message with the result
-    try:
-        client.chat_update(
-            channel=channel_id,
-            ts=response["ts"],
-            text=f"Command: `tf {command_text}`\n\n{format_for_slack(result)}"
-        )
-    except SlackApiError as e:
-        logger.error(f"Error updating message: {e}")
-        say(f"Command: `tf {command_text}`\n\n{format_for_slack(result)}")
+    # Run the command and update the message with the result
+    _command_executor.submit(_run_and_update, client, channel_id, response["ts"], command_text, say)
 
 
 def start_bot():
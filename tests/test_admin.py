@@ -0,0 +1,25 @@
+from taskflows import _SYSTEMD_FILE_PREFIX
+from taskflows.admin import sort_service_names
+
+STOP_PREFIX = f"stop-{_SYSTEMD_FILE_PREFIX}"
+
+
+def test_sort_service_names():
+    services = ["b", f"{STOP_PREFIX}a", "c_x", "a", "c-a", f"{STOP_PREFIX}c_x"]
+    # stop services follow their main service, including the first service's.
+    assert sort_service_names(services) == [
+        "a",
+        f"{STOP_PREFIX}a",
+        "b",
+        "c-a",
+        "c_x",
+        f"{STOP_PREFIX}c_x",
+    ]
+
+
+def test_sort_service_names_empty():
+    assert sort_service_names([]) == []
+
+
+def test_sort_service_names_drops_orphan_stop_services():
+    assert sort_service_names(["a", f"{STOP_PREFIX}orphan"]) == ["a"]
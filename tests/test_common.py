@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from taskflows.common import ShutdownHandler
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_shutdown_waits_for_cancelled_tasks(loop):
+    sdh = ShutdownHandler(loop=loop)
+    cleaned_up = []
+
+    async def worker():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            # cleanup that takes a while after cancellation.
+            await asyncio.sleep(0.5)
+            cleaned_up.append(True)
+            raise
+
+    async def main():
+        loop.create_task(worker())
+        await asyncio.sleep(0)
+        # main awaits the shutdown, like async_entrypoint does.
+        await sdh.shutdown(0)
+
+    with pytest.raises(SystemExit) as exc:
+        loop.run_until_complete(main())
+    assert exc.value.code == 0
+    assert cleaned_up
@@ -0,0 +1,49 @@
+import pytest
+
+from taskflows.dashboard import (
+    LogsCountPlot,
+    LogsTextSearch,
+    ServiceLogsPanel,
+    _layout_panels,
+)
+from taskflows.service import Service
+
+# count plots are built with grafanalib.
+pytest.importorskip("grafanalib")
+
+
+def grid_pos(panel) -> dict:
+    if isinstance(panel, dict):
+        return panel["gridPos"]
+    gp = panel.gridPos
+    return {"h": gp.h, "w": gp.w, "x": gp.x, "y": gp.y}
+
+
+def title(panel) -> str:
+    return panel["title"] if isinstance(panel, dict) else panel.title
+
+
+def test_layout_panels():
+    a = Service(name="a", start_command="echo a")
+    b = Service(name="b", start_command="echo b")
+    c = Service(name="c", start_command="echo c")
+    panels = _layout_panels(
+        [
+            ServiceLogsPanel(a, "md"),
+            [LogsTextSearch(b, "sm", text="error"), LogsCountPlot(c, "lg", text="warn")],
+            [ServiceLogsPanel(a, "xl", width_fr=0.25), ServiceLogsPanel(b, "sm")],
+        ]
+    )
+    # one Grafana panel per grid panel.
+    assert len(panels) == 5
+    assert [title(p) for p in panels] == ["a", "b: error", "c: warn Counts", "a", "b"]
+    assert [grid_pos(p) for p in panels] == [
+        {"h": 10, "w": 24, "x": 0, "y": 0},
+        {"h": 5, "w": 12, "x": 0, "y": 10},
+        {"h": 15, "w": 12, "x": 12, "y": 10},
+        # rows start below the tallest panel of the previous row.
+        {"h": 20, "w": 6, "x": 0, "y": 25},
+        {"h": 5, "w": 12, "x": 6, "y": 25},
+    ]
+    assert panels[0]["targets"][0]["expr"] == '{name="/a"}'
+    assert panels[1]["targets"][0]["expr"] == '{name="/b"} |= "error"'
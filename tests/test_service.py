@@ -7,10 +7,10 @@ import pytest
 
 from taskflows import _SYSTEMD_FILE_PREFIX
 from taskflows.service import Calendar, Periodic, Service, constraints
-from taskflows.service.service import systemd_dir
+from taskflows.service.service import _make_unit_match_pattern, systemd_dir
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def log_dir():
     d = Path(__file__).parent / "logs"
     d.mkdir(exist_ok=True)
@@ -22,15 +22,25 @@ def create_test_name():
     return f"test_{time()}".replace(".", "")
 
 
+def wait_for_log(log_file: Path, text: str, timeout: float):
+    """Poll until `log_file` contains `text`, so tests only wait as long as the service takes to run."""
+    deadline = time() + timeout
+    while time() < deadline:
+        if log_file.is_file() and log_file.read_text().strip() == text:
+            return
+        sleep(0.1)
+    pytest.fail(f"{log_file} did not contain {text!r} within {timeout}s")
+
+
 def test_config():
     v = Calendar("Sun 17:00 America/New_York")
-    assert isinstance(v.unit_entries, set)
+    assert isinstance(v.unit_entries, list)
 
     v = Periodic(start_on="boot", period=10, relative_to="start")
-    assert isinstance(v.unit_entries, set)
+    assert isinstance(v.unit_entries, list)
 
     v = Periodic("login", 1, "start")
-    assert isinstance(v.unit_entries, set)
+    assert isinstance(v.unit_entries, list)
 
     v = constraints.Memory(amount=1000000, constraint=">=", silent=True)
     assert isinstance(v.unit_entries, set)
@@ -54,6 +64,21 @@ def test_config():
     assert isinstance(v.unit_entries, set)
 
 
+@pytest.mark.parametrize(
+    "unit_type,match,pattern",
+    [
+        (None, None, f"*{_SYSTEMD_FILE_PREFIX}*.*"),
+        ("service", "foo", f"*{_SYSTEMD_FILE_PREFIX}foo.service"),
+        # the unit type suffix is not added twice.
+        ("service", "foo.service", f"*{_SYSTEMD_FILE_PREFIX}foo.service"),
+        # matches that already contain the prefix are not prefixed again.
+        ("timer", f"{_SYSTEMD_FILE_PREFIX}x*", f"{_SYSTEMD_FILE_PREFIX}x*.timer"),
+    ],
+)
+def test_make_unit_match_pattern(unit_type, match, pattern):
+    assert _make_unit_match_pattern(unit_type=unit_type, match=match) == pattern
+
+
 def test_service_management(log_dir):
     # create a minimal service.
     test_name = create_test_name()
@@ -66,9 +91,7 @@ def test_service_management(log_dir):
     assert service_file.is_file()
     assert len(service_file.read_text())
     srv.start()
-    sleep(0.5)
-    assert log_file.is_file()
-    assert log_file.read_text().strip() == test_name
+    wait_for_log(log_file, test_name, timeout=2)
     srv.remove()
     assert not service_file.exists()
 
@@ -87,8 +110,10 @@ def test_schedule(log_dir):
     assert timer_file.is_file()
     assert len(timer_file.read_text())
     assert not log_file.is_file()
-    sleep((run_time - datetime.now(timezone.utc)).total_seconds() + 0.5)
-    assert log_file.is_file()
-    assert log_file.read_text().strip() == test_name
+    wait_for_log(
+        log_file,
+        test_name,
+        timeout=(run_time - datetime.now(timezone.utc)).total_seconds() + 5,
+    )
     srv.remove()
     assert not timer_file.exists()